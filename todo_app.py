@@ -3,107 +3,312 @@ from tkinter import ttk, messagebox, simpledialog
 import tkcalendar as cal
 import sqlite3
 import hashlib
+import hmac
 import os
+import re
 import datetime
+import time
 from functools import partial
+from contextlib import contextmanager
+from collections import OrderedDict
+
+try:
+    # fastpbkdf2 is a faster drop-in replacement for hashlib's PBKDF2
+    from fastpbkdf2 import pbkdf2_hmac
+except ImportError:
+    from hashlib import pbkdf2_hmac
+
+# Version tags prepended to stored password hashes, followed by salt and key
+PASSWORD_PBKDF2 = b'\x01'  # PBKDF2-HMAC-SHA256, 100000 iterations
+PASSWORD_SCRYPT = b'\x02'
+PASSWORD_PBKDF2_TUNED = b'\x03'  # PBKDF2-HMAC-SHA256, 4-byte iteration count before the salt
+# Scheme used for new hashes; hashlib.scrypt is missing on builds without OpenSSL 1.1
+PASSWORD_SCHEME = PASSWORD_SCRYPT if hasattr(hashlib, 'scrypt') else PASSWORD_PBKDF2_TUNED
+SALT_LENGTH = 16
+
+# New PBKDF2 hashes use as many iterations as fit in this time on the current machine
+PBKDF2_TARGET_SECONDS = 0.1
+PBKDF2_MIN_ITERATIONS = 100000
+_pbkdf2_iterations = None
+
+def pbkdf2_iterations():
+    """Return the PBKDF2 iteration count for new hashes, measured once per run"""
+    global _pbkdf2_iterations
+    if _pbkdf2_iterations is None:
+        sample = 50000
+        start = time.perf_counter()
+        pbkdf2_hmac('sha256', b'x', b'x' * SALT_LENGTH, sample, 32)
+        elapsed = time.perf_counter() - start
+        _pbkdf2_iterations = max(PBKDF2_MIN_ITERATIONS, int(sample * PBKDF2_TARGET_SECONDS / elapsed))
+    return _pbkdf2_iterations
+
+# Hashes created before version tags were added: 32-byte salt + 32-byte key
+LEGACY_HASH_LENGTH = 64
+
+# Fixed SQL statements; reusing the same string objects keeps lookups in the
+# connection's statement cache cheap
+SQL_ADD_USER = "INSERT INTO users (username, password_hash) VALUES (?, ?)"
+SQL_GET_USER = "SELECT id, password_hash FROM users WHERE username = ?"
+SQL_UPDATE_PASSWORD = "UPDATE users SET password_hash = ? WHERE id = ?"
+
+SQL_ADD_TODO = "INSERT INTO todos (user_id, date, title, description, due_time, priority) VALUES (?, ?, ?, ?, ?, ?)"
+
+# Inserts nothing when the date, or the due time on today's date, has already passed
+SQL_ADD_UPCOMING_TODO = """INSERT INTO todos (user_id, date, title, description, due_time, priority)
+SELECT :user_id, :date, :title, :description, :due_time, :priority
+WHERE :date > date('now', 'localtime')
+   OR (:date = date('now', 'localtime')
+       AND (:due_time IS NULL OR :due_time >= strftime('%H:%M', 'now', 'localtime')))"""
+
+# A pending todo is overdue once its date, or its due time on that date, has passed.
+# Binds the current date and time as :today and :now_hm, so queries embedding it
+# can put their own named parameters anywhere. The row-value comparison checks
+# the date first and only then the due time; a NULL due time makes it NULL, so
+# todos for today without a due time are not overdue
+SQL_OVERDUE = "status = 'pending' AND (date, due_time) < (:today, :now_hm)"
+
+# Columns shown in the todo list; the last one is the status used for row styling.
+# A missing due time comes back as "" so the UI never has to check for None
+SQL_TODO_FIELDS = f"""id, date, title, description, status, COALESCE(due_time, ''), priority,
+    CASE WHEN {SQL_OVERDUE} THEN 'overdue' ELSE status END AS display_status"""
+
+SQL_GET_TODOS_BY_DATE = f"""SELECT {SQL_TODO_FIELDS}
+FROM todos
+WHERE user_id = :user_id AND date = :date
+ORDER BY priority_rank, id DESC"""
+
+SQL_SEARCH_TODOS = f"""SELECT {SQL_TODO_FIELDS}
+FROM todos
+WHERE user_id = :user_id AND (title LIKE :pattern OR description LIKE :pattern)
+ORDER BY date DESC, id DESC"""
+
+SQL_GET_TODOS_BY_PRIORITY = f"""SELECT {SQL_TODO_FIELDS}
+FROM todos
+WHERE user_id = :user_id AND status = 'pending'
+ORDER BY priority_rank, date ASC, due_time ASC"""  # Sort by priority, then date, then due time
+
+# A NULL due time or priority leaves the stored value unchanged
+SQL_UPDATE_TODO = """UPDATE todos SET title = ?, description = ?,
+    due_time = COALESCE(?, due_time), priority = COALESCE(?, priority)
+WHERE id = ?"""
+
+# Run once per id with executemany, see Database._execute_for_ids
+SQL_DELETE_TODO = "DELETE FROM todos WHERE id = ?"
+SQL_MARK_DONE = "UPDATE todos SET status = 'completed', completed_date = ? WHERE id = ?"
+SQL_MARK_PENDING = "UPDATE todos SET status = 'pending', completed_date = NULL WHERE id = ?"
+
+# One pass over the user's todos for all three counters. COUNT(CASE ...) is
+# used instead of FILTER so older SQLite builds work too
+SQL_TODO_STATS = f"""SELECT
+    COUNT(CASE WHEN status = 'completed' THEN 1 END),
+    COUNT(CASE WHEN status = 'pending' THEN 1 END),
+    COUNT(CASE WHEN {SQL_OVERDUE} THEN 1 END)
+FROM todos
+WHERE user_id = :user_id"""
+
+# Number of get_todos_by_date results kept by get_todos_by_date_cached
+DATE_CACHE_SIZE = 16
+
+# Bumped whenever SQL_CREATE_TABLES, TODO_COLUMNS or SQL_CREATE_INDEXES change
+SCHEMA_VERSION = 5
+
+SQL_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT DEFAULT 'pending',
+    due_time TEXT DEFAULT NULL,
+    completed_date TEXT DEFAULT NULL,
+    priority TEXT DEFAULT 'medium',
+    priority_rank INTEGER GENERATED ALWAYS AS (CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END) VIRTUAL,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+"""
+
+# Columns added to todos after its first release, for upgrading old databases
+TODO_COLUMNS = [
+    ("status", "TEXT DEFAULT 'pending'"),
+    ("due_time", "TEXT DEFAULT NULL"),
+    ("completed_date", "TEXT DEFAULT NULL"),
+    ("priority", "TEXT DEFAULT 'medium'"),
+    # Sort key for priority so ORDER BY can use an index; needs SQLite 3.31+
+    ("priority_rank", "INTEGER GENERATED ALWAYS AS "
+                      "(CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END) VIRTUAL"),
+]
+
+# Indexes for the per-user date listing, the priority listing and status counts.
+# idx_todos_user_date_prio returns a day's todos in SQL_GET_TODOS_BY_DATE order and
+# replaces the older (user_id, date) index. idx_todos_user_prio returns pending todos
+# already in priority order and holds every column get_todo_stats reads, so neither
+# query sorts or touches the table; it replaces the older (user_id, status) and
+# (user_id, status, date, due_time) indexes
+SQL_CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_todos_user_date_prio ON todos (user_id, date, priority_rank, id DESC);
+CREATE INDEX IF NOT EXISTS idx_todos_user_prio ON todos (user_id, status, priority_rank, date, due_time);
+DROP INDEX IF EXISTS idx_todos_user_date;
+DROP INDEX IF EXISTS idx_todos_user_status;
+DROP INDEX IF EXISTS idx_todos_user_status_date;
+"""
 
 class Database:
     def __init__(self):
         # Create database if it doesn't exist
-        self.conn = sqlite3.connect('todo_app.db')
+        # isolation_level=None leaves transactions to us: single statements commit on
+        # their own and grouped writes go through transaction()
+        self.conn = sqlite3.connect('todo_app.db', cached_statements=256,
+                                    isolation_level=None)
         self.cursor = self.conn.cursor()
         
-        # Create tables if they don't exist
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL
-        )
-        ''')
-        
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS todos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            title TEXT NOT NULL,
-            description TEXT,
-            status TEXT DEFAULT 'pending',
-            due_time TEXT DEFAULT NULL,
-            completed_date TEXT DEFAULT NULL,
-            priority TEXT DEFAULT 'medium',
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-        ''')
-        
-        # Check if we need to alter the existing todos table to add new columns
-        try:
-            self.cursor.execute("SELECT status, due_time, completed_date, priority FROM todos LIMIT 1")
-        except sqlite3.OperationalError:
-            # Need to add new columns
-            try:
-                self.cursor.execute("ALTER TABLE todos ADD COLUMN status TEXT DEFAULT 'pending'")
-                self.cursor.execute("ALTER TABLE todos ADD COLUMN due_time TEXT DEFAULT NULL")
-                self.cursor.execute("ALTER TABLE todos ADD COLUMN completed_date TEXT DEFAULT NULL")
-                self.cursor.execute("ALTER TABLE todos ADD COLUMN priority TEXT DEFAULT 'medium'")
-                self.conn.commit()
-            except sqlite3.OperationalError:
-                pass  # Column may already exist
-
+        # WAL mode is persistent for the database file, the other settings apply per connection
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, avoids an fsync per commit
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+        self.cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+        self.cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB memory-mapped I/O
+        self.cursor.execute("PRAGMA busy_timeout=30000")
+        self.cursor.execute("PRAGMA foreign_keys=ON")
+        
+        # Recent get_todos_by_date results; _version is bumped by every todo write,
+        # so entries from before a write can no longer be hit
+        self._version = 0
+        self._date_cache = OrderedDict()
+        
+        # Create or upgrade the schema if this database file is older than the app
+        version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self.migrate_schema()
+    
+    def migrate_schema(self):
+        """Bring the tables and indexes up to SCHEMA_VERSION in one transaction"""
+        script = SQL_CREATE_TABLES
+        
+        # Databases from before versioning may lack the newer todo columns
+        columns = {row[1] for row in self.cursor.execute("PRAGMA table_xinfo(todos)")}
+        if columns:
+            for name, definition in TODO_COLUMNS:
+                if name not in columns:
+                    script += f"ALTER TABLE todos ADD COLUMN {name} {definition};\n"
+        
+        script += SQL_CREATE_INDEXES
+        script += f"PRAGMA user_version = {SCHEMA_VERSION};\n"
+        
+        # executescript runs outside of the sqlite3 module's implicit transactions,
+        # so open one explicitly; the context manager rolls it back on failure
+        with self.conn:
+            self.conn.executescript("BEGIN;\n" + script + "COMMIT;\n")
+    
+    @contextmanager
+    def transaction(self, behavior="IMMEDIATE"):
+        """Run the enclosed statements in one transaction, committed once on success"""
+        if self.conn.in_transaction:
+            # Nested use joins the outer transaction, which commits for both
+            yield
+            return
+        # IMMEDIATE takes the write lock up front instead of failing halfway through;
+        # read-only callers pass DEFERRED and just get one consistent snapshot
+        self.cursor.execute(f"BEGIN {behavior}")
         try:
-            self.cursor.execute("SELECT priority FROM todos LIMIT 1")
-        except sqlite3.OperationalError:
-            # Need to add priority column
-            try:
-                self.cursor.execute("ALTER TABLE todos ADD COLUMN priority TEXT DEFAULT 'medium'")
-                self.conn.commit()
-                print("Added missing priority column to the todos table")
-            except sqlite3.OperationalError:
-                pass  # Column may already exist
-                
-        self.conn.commit()
+            yield
+            self.cursor.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT (e.g. a deferred constraint) leaves the transaction open;
+            # SQLite may also have rolled back already on some errors
+            if self.conn.in_transaction:
+                self.cursor.execute("ROLLBACK")
+            raise
     
     def close(self):
+        # Let SQLite refresh its planner statistics for the next session
+        self.cursor.execute("PRAGMA optimize")
         self.conn.close()
         
     def hash_password(self, password):
         """Hash a password for storing."""
-        salt = os.urandom(32)  # A new salt for this user
-        key = hashlib.pbkdf2_hmac(
+        salt = os.urandom(SALT_LENGTH)  # A new salt for this user
+        if PASSWORD_SCHEME == PASSWORD_SCRYPT:
+            # Store version tag, salt and key
+            return PASSWORD_SCRYPT + salt + self._scrypt(password, salt)
+        # Store version tag, iteration count, salt and key
+        iterations = pbkdf2_iterations()
+        return (PASSWORD_PBKDF2_TUNED + iterations.to_bytes(4, 'big') + salt
+                + self._pbkdf2(password, salt, iterations))
+    
+    def _pbkdf2(self, password, salt, iterations=100000):
+        """Derive a key from a password with PBKDF2-HMAC-SHA256"""
+        return pbkdf2_hmac(
             'sha256',  # Hash algorithm
             password.encode('utf-8'),  # Convert password to bytes
             salt,  # Salt
-            100000,  # Number of iterations
+            iterations,  # Number of iterations
+            32
         )
-        # Store salt and key
-        return salt + key
+    
+    def _scrypt(self, password, salt):
+        """Derive a key from a password with scrypt"""
+        return hashlib.scrypt(
+            password.encode('utf-8'),  # Convert password to bytes
+            salt=salt,  # Salt
+            n=32768,  # CPU/memory cost
+            r=8,  # Block size
+            p=1,  # Parallelism
+            maxmem=64 * 1024 * 1024,  # n=32768, r=8 needs 32 MiB, just above the default limit
+            dklen=32,
+        )
+    
+    def needs_rehash(self, stored_password):
+        """Check if a stored password was hashed with an outdated scheme or work factor"""
+        if len(stored_password) == LEGACY_HASH_LENGTH or stored_password[:1] != PASSWORD_SCHEME:
+            return True
+        if PASSWORD_SCHEME == PASSWORD_PBKDF2_TUNED:
+            # Allow for timing noise between runs; upgrade once the machine is twice as fast
+            return int.from_bytes(stored_password[1:5], 'big') < pbkdf2_iterations() // 2
+        return False
     
     def verify_password(self, stored_password, provided_password):
         """Verify a stored password against one provided by user"""
-        salt = stored_password[:32]  # 32 is the length of salt
-        stored_key = stored_password[32:]
-        key = hashlib.pbkdf2_hmac(
-            'sha256',
-            provided_password.encode('utf-8'),
-            salt,
-            100000
-        )
-        return key == stored_key
+        if len(stored_password) == LEGACY_HASH_LENGTH:
+            # Legacy hash without version tag: 32-byte salt + PBKDF2 key
+            salt = stored_password[:32]
+            stored_key = stored_password[32:]
+            key = self._pbkdf2(provided_password, salt)
+        else:
+            version = stored_password[:1]
+            if version == PASSWORD_PBKDF2_TUNED:
+                iterations = int.from_bytes(stored_password[1:5], 'big')
+                salt = stored_password[5:5 + SALT_LENGTH]
+                stored_key = stored_password[5 + SALT_LENGTH:]
+                key = self._pbkdf2(provided_password, salt, iterations)
+            else:
+                salt = stored_password[1:1 + SALT_LENGTH]
+                stored_key = stored_password[1 + SALT_LENGTH:]
+                if version == PASSWORD_PBKDF2:
+                    key = self._pbkdf2(provided_password, salt)
+                elif version == PASSWORD_SCRYPT and hasattr(hashlib, 'scrypt'):
+                    key = self._scrypt(provided_password, salt)
+                else:
+                    return False
+        return hmac.compare_digest(key, stored_key)
 
     def register_user(self, username, password):
         try:
             password_hash = self.hash_password(password)
-            self.cursor.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", 
-                               (username, password_hash))
-            self.conn.commit()
+            self.cursor.execute(SQL_ADD_USER, (username, password_hash))
             return True
         except sqlite3.IntegrityError:
             # Username already exists
             return False
     
     def authenticate_user(self, username, password):
-        self.cursor.execute("SELECT id, password_hash FROM users WHERE username = ?", (username,))
+        self.cursor.execute(SQL_GET_USER, (username,))
         result = self.cursor.fetchone()
         
         if result:
@@ -113,121 +318,124 @@ class Database:
                 stored_password = bytes.fromhex(stored_password)
             
             if self.verify_password(stored_password, password):
+                if self.needs_rehash(stored_password):
+                    # Upgrade old hashes now that we know the plain password
+                    self.cursor.execute(SQL_UPDATE_PASSWORD, (self.hash_password(password), user_id))
                 return user_id
         return None
     
     # Modified: Added due_time parameter
+    # Returns the new todo's id, or None if date and due_time are in the past
     def add_todo(self, user_id, date, title, description="", due_time=None, priority="medium"):
-        self.cursor.execute(
-            "INSERT INTO todos (user_id, date, title, description, due_time, priority) VALUES (?, ?, ?, ?, ?, ?)",
-            (user_id, date, title, description, due_time, priority)
-        )
-        self.conn.commit()
+        self.cursor.execute(SQL_ADD_UPCOMING_TODO,
+                          {'user_id': user_id, 'date': date, 'title': title, 'description': description,
+                           'due_time': due_time, 'priority': priority})
+        if not self.cursor.rowcount:
+            return None
+        self._version += 1
         return self.cursor.lastrowid
     
+    def add_todos_bulk(self, user_id, todos):
+        """Insert many (date, title, description, due_time, priority) rows in one transaction"""
+        with self.transaction():
+            self.cursor.executemany(SQL_ADD_TODO, [(user_id, *todo) for todo in todos])
+            inserted = self.cursor.rowcount  # Read before COMMIT resets it
+        self._version += 1
+        return inserted
+    
     # Modified: Include status in fetched todos
-    def get_todos_by_date(self, user_id, date):
-        self.cursor.execute(
-            "SELECT id, date, title, description, status, due_time, priority FROM todos WHERE user_id = ? AND date = ? ORDER BY CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END, id DESC",
-            (user_id, date)
-        )
+    # current_date ("YYYY-MM-DD") and current_time ("HH:MM") decide which todos are overdue
+    def get_todos_by_date(self, user_id, date, current_date, current_time):
+        self.cursor.execute(SQL_GET_TODOS_BY_DATE,
+                          {'today': current_date, 'now_hm': current_time, 'user_id': user_id, 'date': date})
         return self.cursor.fetchall()
     
-    def search_todos(self, user_id, keyword):
+    def get_todos_by_date_cached(self, user_id, date, current_date, current_time):
+        """Like get_todos_by_date, but serves repeated lookups from memory until the next write"""
+        key = (user_id, date, current_date, current_time, self._version)
+        if key in self._date_cache:
+            self._date_cache.move_to_end(key)
+            return self._date_cache[key]
+        
+        todos = self.get_todos_by_date(user_id, date, current_date, current_time)
+        self._date_cache[key] = todos
+        if len(self._date_cache) > DATE_CACHE_SIZE:
+            self._date_cache.popitem(last=False)  # Drop the least recently used entry
+        return todos
+    
+    # search_todos and get_todos_by_priority return their own cursor rather than a list,
+    # so callers can consume the rows as they are read without a second copy in memory
+    def search_todos(self, user_id, keyword, current_date, current_time):
         search_pattern = f"%{keyword}%"
-        self.cursor.execute(
-            """SELECT id, date, title, description, status, due_time, priority 
-            FROM todos 
-            WHERE user_id = ? AND (title LIKE ? OR description LIKE ?)
-            ORDER BY date DESC, id DESC""",
-            (user_id, search_pattern, search_pattern)
-        )
-        return self.cursor.fetchall()
+        return self.conn.execute(SQL_SEARCH_TODOS,
+                                 {'today': current_date, 'now_hm': current_time, 'user_id': user_id,
+                                  'pattern': search_pattern})
 
     # New: Method to get all todos sorted by priority
-    def get_todos_by_priority(self, user_id):
-        self.cursor.execute(
-            """SELECT id, date, title, description, status, due_time, priority 
-            FROM todos 
-            WHERE user_id = ? AND status = 'pending'
-            ORDER BY CASE priority 
-                WHEN 'high' THEN 1 
-                WHEN 'medium' THEN 2 
-                WHEN 'low' THEN 3 
-            END, date ASC, due_time ASC""",  # Sort by priority, then date, then due time
-            (user_id,)
-        )
-        return self.cursor.fetchall()
+    def get_todos_by_priority(self, user_id, current_date, current_time):
+        return self.conn.execute(SQL_GET_TODOS_BY_PRIORITY,
+                                 {'today': current_date, 'now_hm': current_time, 'user_id': user_id})
     
     # Modified: Update function to include due_time
     def update_todo(self, todo_id, title, description, due_time=None, priority=None):
-        query = "UPDATE todos SET title = ?, description = ?"
-        params = [title, description]
-        
-        if due_time is not None:
-            query += ", due_time = ?"
-            params.append(due_time)
-        
-        if priority is not None:
-            query += ", priority = ?"
-            params.append(priority)
-            
-        query += " WHERE id = ?"
-        params.append(todo_id)
-        
-        self.cursor.execute(query, params)
-        self.conn.commit()
+        self.cursor.execute(SQL_UPDATE_TODO, (title, description, due_time, priority, todo_id))
+        self._version += 1
         return self.cursor.rowcount > 0
     
+    def _execute_for_ids(self, statement, todo_ids, *params):
+        """Run statement for all todo_ids in one transaction and return the number of rows changed"""
+        # One fixed statement for any number of ids, prepared once and found in the statement cache
+        with self.transaction():
+            self.cursor.executemany(statement, [(*params, todo_id) for todo_id in todo_ids])
+            changed = self.cursor.rowcount  # Read before COMMIT resets it
+        self._version += 1
+        return changed
+    
     def delete_todo(self, todo_id):
-        self.cursor.execute("DELETE FROM todos WHERE id = ?", (todo_id,))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        return self.delete_todos([todo_id]) > 0
+    
+    def delete_todos(self, todo_ids):
+        return self._execute_for_ids(SQL_DELETE_TODO, todo_ids)
     
     # New: Mark a todo as done
     def mark_todo_as_done(self, todo_id):
+        return self.mark_todos_as_done([todo_id]) > 0
+    
+    def mark_todos_as_done(self, todo_ids):
         completed_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.cursor.execute("UPDATE todos SET status = 'completed', completed_date = ? WHERE id = ?", 
-                          (completed_date, todo_id))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        return self._execute_for_ids(SQL_MARK_DONE, todo_ids, completed_date)
     
     # New: Mark a todo as pending (undone)
     def mark_todo_as_pending(self, todo_id):
-        self.cursor.execute("UPDATE todos SET status = 'pending', completed_date = NULL WHERE id = ?", 
-                          (todo_id,))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        return self.mark_todos_as_pending([todo_id]) > 0
+    
+    def mark_todos_as_pending(self, todo_ids):
+        return self._execute_for_ids(SQL_MARK_PENDING, todo_ids)
     
     # New: Get statistics for todos
-    def get_todo_stats(self, user_id):
-        # Get count of completed todos
-        self.cursor.execute("SELECT COUNT(*) FROM todos WHERE user_id = ? AND status = 'completed'", 
-                          (user_id,))
-        completed_count = self.cursor.fetchone()[0]
+    def get_todo_stats(self, user_id, current_date=None, current_time=None):
+        # Overdue todos are pending todos with due date in the past
+        if current_date is None:
+            now = datetime.datetime.now()
+            current_date = now.strftime("%Y-%m-%d")
+            current_time = now.strftime("%H:%M")
         
-        # Get count of pending todos
-        self.cursor.execute("SELECT COUNT(*) FROM todos WHERE user_id = ? AND status = 'pending'", 
-                          (user_id,))
-        pending_count = self.cursor.fetchone()[0]
-        
-        # Get count of overdue todos (pending todos with due date in the past)
-        current_date = datetime.datetime.now().strftime("%Y-%m-%d")
-        current_time = datetime.datetime.now().strftime("%H:%M")
-        
-        self.cursor.execute("""
-        SELECT COUNT(*) FROM todos 
-        WHERE user_id = ? AND status = 'pending' 
-        AND (date < ? OR (date = ? AND due_time < ? AND due_time IS NOT NULL))
-        """, (user_id, current_date, current_date, current_time))
-        
-        overdue_count = self.cursor.fetchone()[0]
+        self.cursor.execute(SQL_TODO_STATS,
+                          {'today': current_date, 'now_hm': current_time, 'user_id': user_id})
+        completed_count, pending_count, overdue_count = self.cursor.fetchone()
         
         return {
             'completed': completed_count,
             'pending': pending_count,
             'overdue': overdue_count
         }
+    
+    def fetch_view_and_stats(self, user_id, date, current_date, current_time):
+        """Return (get_todos_by_date_cached rows, get_todo_stats) read in one transaction"""
+        with self.transaction("DEFERRED"):
+            todos = self.get_todos_by_date_cached(user_id, date, current_date, current_time)
+            stats = self.get_todo_stats(user_id, current_date, current_time)
+        return todos, stats
 
 class LoginFrame(tk.Frame):
     def __init__(self, parent, db, show_main_app):
@@ -312,6 +520,18 @@ class LoginFrame(tk.Frame):
         else:
             messagebox.showerror("Error", "Username already exists.")
 
+# How long the pointer has to rest on a row before its tooltip appears
+TOOLTIP_DELAY_MS = 80
+# Rows added to the todo tree at a time; more are added when scrolling reaches the end
+TREE_PAGE_SIZE = 50
+# Todo tree columns, in the order of the row values
+TREE_COLUMNS = ("ID", "Date", "Title", "Description", "Status", "Due", "Priority")
+# Quiet period after the last change before the view and statistics are refreshed
+REFRESH_DELAY_MS = 50
+
+# Zero-padded 24-hour HH:MM, the form the overdue comparison in SQL relies on
+_HHMM_RE = re.compile(r'(?:[01][0-9]|2[0-3]):[0-5][0-9]')
+
 class TodoApp(tk.Frame):
     def __init__(self, parent, db, user_id, username, logout_callback):
         super().__init__(parent, bg="#f7f9f9")
@@ -322,6 +542,15 @@ class TodoApp(tk.Frame):
         self.selected_todo_id = None
         self.current_date = None
         self.last_search_keyword = None  # Initialize search keyword tracking
+        self._stats_pending = None  # Id of the scheduled stats refresh, if any
+        self._refresh_pending = None  # Id of the scheduled view refresh, if any
+        self._item_pool = []  # Detached tree items available for reuse
+        self._todo_rows = []  # Formatted (values, tags) rows of the current view
+        self._rendered_rows = 0  # How many of those rows are in the tree
+        self._row_index = {}  # Todo id -> tree item of every row in the tree
+        self._page_job = None  # Id of the scheduled next-page render, if any
+        self._hover_row = None  # Tree row under the mouse pointer
+        self._hover_job = None  # Id of the scheduled tooltip display, if any
         self.configure(padx=20, pady=20)
         
         # Center the frame within the parent
@@ -335,8 +564,7 @@ class TodoApp(tk.Frame):
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(2, weight=1)
         
-        self.create_widgets()
-        self.update_stats()  # Initialize stats
+        self.create_widgets()  # Also loads today's todos and the stats
         
     def create_widgets(self):
         # Main content frame (centered) with background color
@@ -479,7 +707,7 @@ class TodoApp(tk.Frame):
         style.configure("Treeview.Heading", background="#e1e8ed", font=('Arial', 9, 'bold'))
         
         # Create treeview with date column and status
-        self.tree = ttk.Treeview(list_frame, columns=("ID", "Date", "Title", "Description", "Status", "Due", "Priority"), show="headings", height=15)
+        self.tree = ttk.Treeview(list_frame, columns=TREE_COLUMNS, show="headings", height=15)
         
         self.tree.heading("ID", text="ID")
         self.tree.heading("Date", text="Date")
@@ -497,22 +725,27 @@ class TodoApp(tk.Frame):
         self.tree.column("Due", width=70, anchor="center")
         self.tree.column("Priority", width=70, anchor="center")
         
-        # Configure tree tag colors - add priority colors
-        self.tree.tag_configure('completed', background='#e8f5e9')
-        self.tree.tag_configure('pending', background='white')
-        self.tree.tag_configure('overdue', background='#ffebee')
-        self.tree.tag_configure('high', foreground='#e74c3c')
-        self.tree.tag_configure('medium', foreground='#f39c12')
-        self.tree.tag_configure('low', foreground='#2ecc71')
+        # Configure tree tag colors - one tag per status and priority pair, so each
+        # row carries a single prebuilt tag tuple
+        status_colors = {'completed': '#e8f5e9', 'pending': 'white', 'overdue': '#ffebee'}
+        priority_colors = {'high': '#e74c3c', 'medium': '#f39c12', 'low': '#2ecc71'}
+        self._tag_cache = {}
+        for status, background in status_colors.items():
+            # Status-only tag for rows whose priority isn't one of the known values
+            self.tree.tag_configure(status, background=background)
+            for priority, foreground in priority_colors.items():
+                tag = f"{status}_{priority}"
+                self.tree.tag_configure(tag, background=background, foreground=foreground)
+                self._tag_cache[(status, priority)] = (tag,)
         
         # Configure scrollbars for treeview
-        v_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.v_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
         h_scrollbar = ttk.Scrollbar(list_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll, xscrollcommand=h_scrollbar.set)
         
         # Place the treeview and scrollbars
         self.tree.grid(row=0, column=0, sticky="nsew")
-        v_scrollbar.grid(row=0, column=1, sticky="ns")
+        self.v_scrollbar.grid(row=0, column=1, sticky="ns")
         h_scrollbar.grid(row=1, column=0, sticky="ew")
         
         # Configure grid weights for proper resizing
@@ -522,6 +755,7 @@ class TodoApp(tk.Frame):
         # Add tooltip for treeview items to show full description
         self.tooltip = ToolTip(self.tree)
         self.tree.bind("<Motion>", self.show_tooltip)
+        self.tree.bind("<Leave>", self.hide_tooltip)
         
         # Bind selection event
         self.tree.bind("<<TreeviewSelect>>", self.item_selected)
@@ -559,9 +793,19 @@ class TodoApp(tk.Frame):
         self.current_date = today
         self.load_todos_for_date(today)
     
+    def request_stats_update(self):
+        """Refresh the statistics once requests stop coming in, folding them into one query"""
+        if self._stats_pending:
+            self.after_cancel(self._stats_pending)
+        self._stats_pending = self.after(REFRESH_DELAY_MS, self.update_stats)
+    
     def update_stats(self):
         """Update the statistics display"""
-        stats = self.db.get_todo_stats(self.user_id)
+        self._stats_pending = None
+        self._apply_stats(self.db.get_todo_stats(self.user_id))
+    
+    def _apply_stats(self, stats):
+        """Show a get_todo_stats result in the header"""
         self.completed_label.config(text=f"Done: {stats['completed']}")
         self.pending_label.config(text=f"Pending: {stats['pending']}")
         self.overdue_label.config(text=f"Overdue: {stats['overdue']}")
@@ -569,13 +813,29 @@ class TodoApp(tk.Frame):
     def show_tooltip(self, event):
         """Display a tooltip with full description when hovering over an item"""
         item = self.tree.identify_row(event.y)
+        if item == self._hover_row:
+            return  # Still on the same row, nothing to update
+        
+        self.hide_tooltip()
+        self._hover_row = item
         if item:
-            values = self.tree.item(item, "values")
-            if values and len(values) > 3:  # If we have values and there's a description
-                description = values[3]
-                if description:
-                    self.tooltip.show_tip(description)
-                    return
+            # Wait until the pointer settles so passing over rows doesn't fetch every one
+            self._hover_job = self.after(TOOLTIP_DELAY_MS, self._show_row_tooltip, item)
+    
+    def _show_row_tooltip(self, item):
+        self._hover_job = None
+        values = self.tree.item(item, "values")
+        if values and len(values) > 3:  # If we have values and there's a description
+            description = values[3]
+            if description:
+                self.tooltip.show_tip(description)
+    
+    def hide_tooltip(self, event=None):
+        """Hide the tooltip and forget the hovered row"""
+        if self._hover_job:
+            self.after_cancel(self._hover_job)
+            self._hover_job = None
+        self._hover_row = None
         self.tooltip.hide_tip()
         
     def date_selected(self, event=None):
@@ -584,76 +844,39 @@ class TodoApp(tk.Frame):
         self.load_todos_for_date(selected_date)
         
     def load_todos_for_date(self, date):
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        self.in_priority_view=False
-        self.in_search_mode=False
-        self.last_search_keyword=None
-        # Load todos for the selected date
-        todos = self.db.get_todos_by_date(self.user_id, date)
-        
-        # Current date and time for checking overdue
+        # Reference time for checking overdue, taken once per refresh
         now = datetime.datetime.now()
         current_date = now.strftime("%Y-%m-%d")
         current_time = now.strftime("%H:%M")
-        
-        for todo in todos:
-            todo_id, todo_date, title, description, status, due_time, priority = todo
-            
-            # Determine if task is overdue
-            tag = status
-            if status == 'pending' and (todo_date < current_date or 
-                                    (todo_date == current_date and due_time and due_time < current_time)):
-                tag = 'overdue'
-                
-            item_id = self.tree.insert("", "end", 
-                                values=(todo_id, todo_date, title, description, status, due_time or "", priority), 
-                                tags=(tag, priority))
             
-        # Update statistics
-        self.update_stats()
+        self.in_priority_view=False
+        self.in_search_mode=False
+        self.last_search_keyword=None
+        # Load todos for the selected date and the statistics together
+        todos, stats = self.db.fetch_view_and_stats(self.user_id, date, current_date, current_time)
+        self._sync_tree(todos)
+        self._apply_stats(stats)
 
     def search_todos(self):
         keyword = self.search_entry.get().strip()
         if not keyword:
             messagebox.showinfo("Info", "Please enter a search keyword")
             return
+        
+        # Reference time for checking overdue, taken once per refresh
+        now = datetime.datetime.now()
+        current_date = now.strftime("%Y-%m-%d")
+        current_time = now.strftime("%H:%M")
             
         # Store the search keyword for possible reuse after deletion
         self.in_priority_view=False
         self.in_search_mode = True
         self.last_search_keyword = keyword
             
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Search todos
-        todos = self.db.search_todos(self.user_id, keyword)
-        if not todos:
+        # Search todos and display the results as they are read
+        self._sync_tree(self.db.search_todos(self.user_id, keyword, current_date, current_time))
+        if not self._todo_rows:
             messagebox.showinfo("Search Results", "No todos found matching your search")
-            return
-            
-        # Current date and time for checking overdue
-        now = datetime.datetime.now()
-        current_date = now.strftime("%Y-%m-%d")
-        current_time = now.strftime("%H:%M")
-        
-        # Display results
-        for todo in todos:
-            todo_id, date, title, description, status, due_time, priority = todo
-            
-            # Determine if task is overdue
-            tag = status
-            if status == 'pending' and (date < current_date or 
-                                    (date == current_date and due_time and due_time < current_time)):
-                tag = 'overdue'
-                
-            self.tree.insert("", "end", 
-                        values=(todo_id, date, title, description, status, due_time or "", priority), 
-                        tags=(tag, priority))
     
     def reset_search(self):
         self.search_entry.delete(0, tk.END)
@@ -663,41 +886,120 @@ class TodoApp(tk.Frame):
     
     def show_all_by_priority(self):
         """Display all pending todos sorted by priority"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Reference time for checking overdue, taken once per refresh
+        now = datetime.datetime.now()
+        current_date = now.strftime("%Y-%m-%d")
+        current_time = now.strftime("%H:%M")
             
         # Set flag to indicate we're in priority view mode
         self.in_priority_view = True
         self.in_search_mode=False
         self.last_search_keyword = None  # Clear any search keyword
             
-        # Load all todos sorted by priority
-        todos = self.db.get_todos_by_priority(self.user_id)
+        # Load all todos sorted by priority, straight from the cursor into the tree
+        self._sync_tree(self.db.get_todos_by_priority(self.user_id, current_date, current_time))
         
-        if not todos:
+        if not self._todo_rows:
             messagebox.showinfo("Information", "No pending todos found")
             self.load_todos_for_date(self.current_date)
             self.in_priority_view = False  # Reset the flag
-            return
-        
-        # Current date and time for checking overdue
-        now = datetime.datetime.now()
-        current_date = now.strftime("%Y-%m-%d")
-        current_time = now.strftime("%H:%M")
-        
-        for todo in todos:
-            todo_id, todo_date, title, description, status, due_time, priority = todo
-            
-            # Determine if task is overdue
-            tag = status
-            if status == 'pending' and (todo_date < current_date or 
-                                    (todo_date == current_date and due_time and due_time < current_time)):
-                tag = 'overdue'
-                
-            self.tree.insert("", "end", 
-                        values=(todo_id, todo_date, title, description, status, due_time or "", priority), 
-                        tags=(tag, priority))
+    
+    def _sync_tree(self, todos):
+        """Show todo rows in the tree, only touching the rows that differ from what is shown"""
+        # Format every row first so the Tk pass below does nothing but Tk calls
+        tag_cache = self._tag_cache
+        rows = [((todo_id, todo_date, title, description, status, due_time, priority),
+                 tag_cache.get((display_status, priority), (display_status,)))
+                for todo_id, todo_date, title, description, status, due_time, priority, display_status
+                in todos]
+        # Keep as many rows in the tree as the user had scrolled to, at least one page
+        shown = rows[:max(self._rendered_rows, TREE_PAGE_SIZE)]
+        shown_ids = [values[0] for values, tags in shown]
+        old_rows = {values[0]: (values, tags) for values, tags in self._todo_rows[:self._rendered_rows]}
+        old_order = [values[0] for values, tags in self._todo_rows[:self._rendered_rows]]
+        index = self._row_index
+        pool = self._item_pool
+        
+        # The hovered item may change or be reused for another todo
+        self.hide_tooltip()
+        
+        wanted = set(shown_ids)
+        # Rows that stay only need moving when their order changed, e.g. after a priority edit
+        reorder = [todo_id for todo_id in old_order if todo_id in wanted] != \
+                  [todo_id for todo_id in shown_ids if todo_id in old_rows]
+        
+        # Bind the per-row calls once, this loop runs on every refresh
+        tree_insert = self.tree.insert
+        tree_item = self.tree.item
+        tree_move = self.tree.move
+        tree_set = self.tree.set
+        
+        # Detach the rows that left the view, keeping their items for reuse
+        removed = [index.pop(todo_id) for todo_id in old_order if todo_id not in wanted]
+        if removed:
+            selection = set(self.tree.selection()).intersection(removed)
+            if selection:
+                self.tree.selection_remove(*selection)
+            self.tree.detach(*removed)
+            pool.extend(removed)
+        
+        for position, (values, tags) in enumerate(shown):
+            todo_id = values[0]
+            item = index.get(todo_id)
+            if item is None:
+                # New row, everything before it is already in place
+                if pool:
+                    item = pool.pop()
+                    tree_item(item, values=values, tags=tags)
+                    tree_move(item, "", position)
+                else:
+                    item = tree_insert("", position, values=values, tags=tags)
+                index[todo_id] = item
+            else:
+                # Only send Tk the cells and tags that changed, e.g. just Status after mark as done
+                old_values, old_tags = old_rows[todo_id]
+                if old_values != values:
+                    for column, old_value, value in zip(TREE_COLUMNS, old_values, values):
+                        if old_value != value:
+                            tree_set(item, column, value)
+                if old_tags != tags:
+                    tree_item(item, tags=tags)
+                if reorder:
+                    tree_move(item, "", position)
+        
+        self._todo_rows = rows
+        self._rendered_rows = len(shown)
+    
+    def _render_next_page(self):
+        """Add the next TREE_PAGE_SIZE rows of the current view to the tree"""
+        self._page_job = None
+        start = self._rendered_rows
+        rows = self._todo_rows[start:start + TREE_PAGE_SIZE]
+        self._rendered_rows = start + len(rows)
+        
+        # Bind the per-row calls once for the whole page
+        tree_insert = self.tree.insert
+        tree_item = self.tree.item
+        tree_move = self.tree.move
+        pool = self._item_pool
+        index = self._row_index
+        
+        for values, tags in rows:
+            # Reuse a detached item when there is one instead of creating a new one
+            if pool:
+                item = pool.pop()
+                tree_item(item, values=values, tags=tags)
+                tree_move(item, "", "end")
+            else:
+                item = tree_insert("", "end", values=values, tags=tags)
+            index[values[0]] = item
+
+    def on_tree_scroll(self, first, last):
+        """Update the scrollbar and load more rows once the end of the tree is in view"""
+        self.v_scrollbar.set(first, last)
+        if float(last) >= 1.0 and self._rendered_rows < len(self._todo_rows) and not self._page_job:
+            # Tk is in the middle of redrawing the tree, add the rows afterwards
+            self._page_job = self.after_idle(self._render_next_page)
 
     def clear_form(self):
         self.title_entry.delete(0, tk.END)
@@ -708,60 +1010,55 @@ class TodoApp(tk.Frame):
         self.save_btn.config(text="Add Todo")
         
         # Deselect any selected item in the tree
-        for selected_item in self.tree.selection():
-            self.tree.selection_remove(selected_item)
+        selection = self.tree.selection()
+        if selection:
+            self.tree.selection_remove(*selection)
 
     def _refresh_current_view(self):
+        """Refresh the current view once changes stop coming in, so a burst of edits reloads it once"""
+        if self._refresh_pending:
+            self.after_cancel(self._refresh_pending)
+        self._refresh_pending = self.after(REFRESH_DELAY_MS, self._do_refresh)
+    
+    def _do_refresh(self):
         """Helper method to refresh the current view after adding/editing/deleting todos"""
+        self._refresh_pending = None
         if self.in_priority_view:
             # If we're in priority view, reload priority view
             self.show_all_by_priority()
+            self.request_stats_update()
         elif self.in_search_mode and self.last_search_keyword:
             # If we're in search results, reload search
             self.search_entry.delete(0, tk.END)
             self.search_entry.insert(0, self.last_search_keyword)
             self.search_todos()
+            self.request_stats_update()
         else:
-            # Otherwise reload current date view
+            # Otherwise reload current date view, which updates the stats too
             self.load_todos_for_date(self.current_date)
 
 
     def save_todo(self):
-        print("Save button clicked")  # Debug line
         title = self.title_entry.get().strip()
-        description = self.description_text.get(1.0, tk.END).strip()
-        due_time = self.due_time_entry.get().strip()
-        priority = self.priority_var.get()
-        
-        print(f"Title: {title}, Priority: {priority}")  # Debug line
+        if not title:
+            messagebox.showerror("Error", "Title is required")
+            return
         
         # Validate due time format if provided
+        due_time = self.due_time_entry.get().strip()
         if due_time and not self.validate_time_format(due_time):
             messagebox.showerror("Error", "Due time must be in HH:MM format")
             return
         
-        if not title:
-            messagebox.showerror("Error", "Title is required")
-            return
-        
-        # Get selected date
+        priority = self.priority_var.get()
+        mode = self.save_btn.cget("text")  # "Add Todo" or "Update Todo"
         selected_date = self.calendar.get_date()
-        current_date = datetime.date.today().strftime("%Y-%m-%d")
         
-        # Check if trying to add a todo in the past
-        if self.save_btn.cget("text") == "Add Todo" and selected_date < current_date:
-            messagebox.showerror("Error", "Cannot add todos for past dates")
-            return
-        
-        # Check if trying to add a todo for today but with past time
-        if self.save_btn.cget("text") == "Add Todo" and selected_date == current_date and due_time:
-            current_time = datetime.datetime.now().strftime("%H:%M")
-            if due_time < current_time:
-                messagebox.showerror("Error", "Cannot add todos with past time")
-                return
+        # The description can be long, so only read it once the todo is going to be saved
+        description = self.description_text.get(1.0, tk.END).strip()
                 
         # Check if we're in edit mode or add mode
-        if self.save_btn.cget("text") == "Update Todo":  # Update existing todo
+        if mode == "Update Todo":  # Update existing todo
             if self.selected_todo_id and self.db.update_todo(self.selected_todo_id, title, description, 
                             due_time if due_time else None, priority):
                 messagebox.showinfo("Success", "Todo updated successfully")
@@ -771,8 +1068,8 @@ class TodoApp(tk.Frame):
             else:
                 messagebox.showerror("Error", "Failed to update todo")
         else:  # Add new todo
-            date = self.calendar.get_date()
-            todo_id = self.db.add_todo(self.user_id, date, title, description, 
+            # The database refuses todos whose date or due time has already passed
+            todo_id = self.db.add_todo(self.user_id, selected_date, title, description, 
                                 due_time if due_time else None, priority)
             if todo_id:
                 messagebox.showinfo("Success", "Todo added successfully")
@@ -780,15 +1077,11 @@ class TodoApp(tk.Frame):
                 # Reload the current view
                 self._refresh_current_view()
             else:
-                messagebox.showerror("Error", "Failed to add todo")
+                messagebox.showerror("Error", "Cannot add todos for past dates or times")
 
     def validate_time_format(self, time_str):
         """Check if time string is in HH:MM format"""
-        try:
-            datetime.datetime.strptime(time_str, "%H:%M")
-            return True
-        except ValueError:
-            return False
+        return _HHMM_RE.fullmatch(time_str) is not None
     
     def item_selected(self, event):
         selected_items = self.tree.selection()
@@ -821,7 +1114,7 @@ class TodoApp(tk.Frame):
             
             # Set due time if it exists
             self.due_time_entry.delete(0, tk.END)
-            if values[5] and values[5] != "None":  # Due time
+            if values[5]:  # Due time
                 self.due_time_entry.insert(0, values[5])
                 
             # Set priority
@@ -831,46 +1124,62 @@ class TodoApp(tk.Frame):
             # Change button text to indicate update mode
             self.save_btn.config(text="Update Todo")
     
-    # New: Mark selected todo as done
+    def _selected_todo_ids(self):
+        """Ids of all todos selected in the tree"""
+        return [self.tree.item(item, "values")[0] for item in self.tree.selection()]
+    
+    # New: Mark selected todos as done
     def mark_as_done(self):
-        if not self.selected_todo_id:
+        todo_ids = self._selected_todo_ids()
+        if not todo_ids:
             messagebox.showinfo("Info", "Please select a todo first")
             return
             
-        if self.db.mark_todo_as_done(self.selected_todo_id):
-            messagebox.showinfo("Success", "Todo marked as completed")
+        if self.db.mark_todos_as_done(todo_ids):
+            if len(todo_ids) == 1:
+                messagebox.showinfo("Success", "Todo marked as completed")
+            else:
+                messagebox.showinfo("Success", f"{len(todo_ids)} todos marked as completed")
             self._refresh_current_view()
-            self.update_stats()
         else:
             messagebox.showerror("Error", "Failed to update todo status")
     
-    # New: Mark selected todo as pending
+    # New: Mark selected todos as pending
     def mark_as_pending(self):
-        if not self.selected_todo_id:
+        todo_ids = self._selected_todo_ids()
+        if not todo_ids:
             messagebox.showinfo("Info", "Please select a todo first")
             return
             
-        if self.db.mark_todo_as_pending(self.selected_todo_id):
-            messagebox.showinfo("Success", "Todo marked as pending")
+        if self.db.mark_todos_as_pending(todo_ids):
+            if len(todo_ids) == 1:
+                messagebox.showinfo("Success", "Todo marked as pending")
+            else:
+                messagebox.showinfo("Success", f"{len(todo_ids)} todos marked as pending")
             self._refresh_current_view()
-            self.update_stats()
         else:
             messagebox.showerror("Error", "Failed to update todo status")
     
     def delete_selected(self):
-        if not self.selected_todo_id:
+        todo_ids = self._selected_todo_ids()
+        if not todo_ids:
             messagebox.showinfo("Info", "Please select a todo first")
             return
             
-        confirm = messagebox.askyesno("Confirm", "Are you sure you want to delete this todo?")
+        if len(todo_ids) == 1:
+            confirm = messagebox.askyesno("Confirm", "Are you sure you want to delete this todo?")
+        else:
+            confirm = messagebox.askyesno("Confirm", f"Are you sure you want to delete these {len(todo_ids)} todos?")
         if confirm:
-            if self.db.delete_todo(self.selected_todo_id):
-                messagebox.showinfo("Success", "Todo deleted successfully")
+            if self.db.delete_todos(todo_ids):
+                if len(todo_ids) == 1:
+                    messagebox.showinfo("Success", "Todo deleted successfully")
+                else:
+                    messagebox.showinfo("Success", f"{len(todo_ids)} todos deleted successfully")
                 self.selected_todo_id = None
                 
                 # Refresh the current view
                 self._refresh_current_view()
-                self.update_stats()
             else:
                 messagebox.showerror("Error", "Failed to delete todo")
     
@@ -878,6 +1187,14 @@ class TodoApp(tk.Frame):
         confirm = messagebox.askyesno("Confirm", "Are you sure you want to logout?")
         if confirm:
             self.logout_callback()
+    
+    def destroy(self):
+        # Don't let scheduled callbacks run against destroyed widgets
+        for job in (self._stats_pending, self._refresh_pending, self._hover_job, self._page_job):
+            if job:
+                self.after_cancel(job)
+        self._stats_pending = self._refresh_pending = self._hover_job = self._page_job = None
+        super().destroy()
 
 class ToolTip:
     """Create a tooltip for a given widget"""
@@ -933,6 +1250,9 @@ class Application(tk.Tk):
         # Create database connection
         self.db = Database()
         
+        # Container holding the screen currently shown
+        self._current_frame = None
+        
         # Center the window on the screen
         self.center_window()
         
@@ -952,21 +1272,22 @@ class Application(tk.Tk):
         # Set window position
         self.geometry(f"600x500+{x}+{y}")
         
-    def show_login(self):
-        # Clear current frame if any
-        for widget in self.winfo_children():
-            widget.destroy()
+    def _new_screen(self):
+        """Replace the current screen's container with an empty one and return it"""
+        # One destroy call takes the whole previous screen with it
+        if self._current_frame:
+            self._current_frame.destroy()
+        self._current_frame = tk.Frame(self, bg="#f7f9f9")
+        self._current_frame.pack(fill="both", expand=True)
+        return self._current_frame
         
+    def show_login(self):
         # Create and show login frame
-        login_frame = LoginFrame(self, self.db, self.show_main_app)
+        login_frame = LoginFrame(self._new_screen(), self.db, self.show_main_app)
         
     def show_main_app(self, user_id, username):
-        # Clear current frame
-        for widget in self.winfo_children():
-            widget.destroy()
-        
         # Create and show main app
-        todo_app = TodoApp(self, self.db, user_id, username, self.show_login)
+        todo_app = TodoApp(self._new_screen(), self.db, user_id, username, self.show_login)
         
     def on_closing(self):
         # Close database connection and exit